@@ -1,24 +1,24 @@
 document.addEventListener('DOMContentLoaded', () => {
-    const startBtn = document.getElementById('x074f37');
-    const indicator = document.getElementById('x714ada');
-    const logWindow = document.getElementById('xfb47c4');
+    const startBtn = document.getElementById('x24a55ac104');
+    const indicator = document.getElementById('x93692e9f0e');
+    const logWindow = document.getElementById('xfee142ea3b');
 
     startBtn.addEventListener('click', () => {
         // Toggle system status via class replacement
-        if (indicator.classList.contains('x611201')) {
-            indicator.classList.remove('x611201');
+        if (indicator.classList.contains('x4a38e2ea9e')) {
+            indicator.classList.remove('x4a38e2ea9e');
             indicator.classList.add('label-active');
             indicator.textContent = 'Operational';
             
             // Show the log window
-            logWindow.classList.remove('x3ded60');
+            logWindow.classList.remove('xfcec916ab0');
             startBtn.textContent = 'Shutdown';
         } else {
-            indicator.classList.add('x611201');
+            indicator.classList.add('x4a38e2ea9e');
             indicator.classList.remove('label-active');
             indicator.textContent = 'Standby';
             
-            logWindow.classList.add('x3ded60');
+            logWindow.classList.add('xfcec916ab0');
             startBtn.textContent = 'Initialize System';
         }
     });
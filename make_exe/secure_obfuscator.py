@@ -13,11 +13,15 @@ Version: 2.0.0 (Production Ready)
 
 import os
 import re
+import sys
 import shutil
 import hashlib
+import mmap
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, partial
 from pathlib import Path
-from typing import Dict, Set, List, Pattern
+from typing import Dict, Set, Tuple, Iterator, Pattern
 from dataclasses import dataclass, field
 
 # --- LOGGER CONFIGURATION ---
@@ -28,6 +32,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Obfuscator")
 
+# Files larger than this are scanned through mmap instead of being read whole
+MMAP_THRESHOLD = 1 << 20  # 1 MiB
+
+# Up to this many keys, JS literals are replaced with plain str.replace
+# (two C-level scans per key beat one regex pass only for small mappings)
+JS_REPLACE_MAX_KEYS = 8
+
+# HTML file suffixes (tuple, so it can be passed to str.endswith)
+HTML_EXTENSIONS = ('.html', '.htm')
+
+# --- PRECOMPILED PATTERNS ---
+# Attribute split into its parts: (class=|id=)(["'])(values)(quote) (replacement)
+ATTR_PATTERN = re.compile(r'\b((?:class|id)=)("|\')(.*?)(\2)')
+# Values inside class="" and id="" (discovery, over raw bytes)
+ATTR_VALUE_PATTERN = re.compile(rb'\b(?:class|id)=["\'](.*?)["\']')
+# Selector-like name right after a dot or hash (CSS):
+# (?<=[.#])  -> Look for the word only if preceded by a dot or hash
+# ([\w-]+)   -> The whole word, so 'btn' never matches inside 'btn-group'
+# NOTE: This pattern won't match --variable since it has two hyphens, not . or #
+CSS_SELECTOR_PATTERN = re.compile(r'(?<=[.#])([\w-]+)')
+
 @dataclass
 class Config:
     """Centralized project configuration."""
@@ -60,9 +85,11 @@ class Hasher:
     @staticmethod
     def generate(name: str) -> str:
         """Creates a short valid CSS identifier (starts with a letter)."""
-        hash_obj = hashlib.md5(name.encode())
+        # 5 bytes -> 10 hex chars: no truncation, and collisions stay unlikely
+        # even for tens of thousands of selectors
+        hash_obj = hashlib.blake2b(name.encode(), digest_size=5)
         # Prefix 'x' ensures the name doesn't start with a digit or hyphen
-        return f"x{hash_obj.hexdigest()[:6]}"
+        return f"x{hash_obj.hexdigest()}"
 
 class ContextProcessor:
     """
@@ -72,30 +99,100 @@ class ContextProcessor:
 
     def __init__(self, mapping: Dict[str, str]):
         self.mapping = mapping
-        # Sort keys by length (longest to shortest) to avoid 
-        # partial replacement (e.g., to prevent 'btn' from breaking 'btn-group')
-        self.sorted_keys = sorted(self.mapping.keys(), key=len, reverse=True)
+        # All keys as one trie-shaped regex. Longer keys are tried first by
+        # construction, so 'btn' can never break 'btn-group' (no sorting needed)
+        keys_pattern = self._trie_pattern(self.mapping)
+
+        # Kept for the JS pattern, which is compiled only when a file needs it
+        self._keys_pattern = keys_pattern
+
+        # Small mapping: quoted literals are replaced directly, without the regex engine
+        self._js_literals = None
+        if len(self.mapping) <= JS_REPLACE_MAX_KEYS:
+            self._js_literals = [
+                (f"{quote}{key}{quote}", f"{quote}{target}{quote}")
+                for key, target in self.mapping.items()
+                for quote in '"\''
+            ]
+
+        # Same keys over raw bytes: a cheap check whether a file needs processing at all
+        self._probe = re.compile(keys_pattern.encode())
+
+    @cached_property
+    def _js_pattern(self) -> Pattern:
+        """Compiled on first use: runs without JS files or with a small mapping never build it."""
+        # One pattern for all keys, so JS literals are replaced in one pass
+        # over the file instead of one full re.sub per key.
+        # (["'])         -> Opening quote
+        # (keys)         -> Any known class name (longest first)
+        # (?=\1)         -> Closing quote (not consumed, it may open the next literal)
+        return re.compile(r'(["\'])(' + self._keys_pattern + r')(?=\1)')
+
+    @staticmethod
+    def _trie_pattern(keys) -> str:
+        """
+        Builds a regex that matches any of the keys, e.g.
+        ['nav', 'navbar', 'card'] -> (?:nav(?:bar)?|card)
+        Common prefixes are shared, so matching cost depends on key length rather
+        than on the number of keys, and the longest key is always tried first.
+        """
+        trie: Dict[str, dict] = {}
+        for key in keys:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[''] = {}  # End of a key
+
+        # Post-order walk with an explicit stack: a node needs the patterns of its
+        # children first, and recursion would overflow on keys of ~1000+ characters
+        built: Dict[int, str] = {}  # id(node) -> pattern of that subtree
+        stack = [(trie, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for char, child in node.items() if char)
+                continue
+
+            branches = [re.escape(char) + built.pop(id(child))
+                        for char, child in node.items() if char]
+            if not branches:
+                body = ''
+            else:
+                body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+                if '' in node:
+                    # A key ends here; the optional tail is greedy, so longer keys win
+                    body = f"(?:{body})?"
+            built[id(node)] = body
+
+        return built[id(trie)]
+
+    def mentions_any(self, raw: bytes) -> bool:
+        """Quick check on raw file bytes: does any known key occur at all?"""
+        return bool(self.mapping) and self._probe.search(raw) is not None
 
     def process_html(self, content: str) -> str:
         """
         Safe HTML processing.
         Changes classes and IDs only inside class="..." and id="..." attributes.
         """
-        def replace_attr_value(match):
-            attr_name = match.group(1) # class or id
-            quote = match.group(2)     # " or '
-            values = match.group(3)    # attribute content (e.g., "btn btn-red")
-            
-            new_values = []
-            for val in values.split():
-                # If value is in mapping, replace it. Otherwise, keep original.
-                new_values.append(self.mapping.get(val, val))
-            
-            return f'{attr_name}={quote}{" ".join(new_values)}{quote}'
-
-        # Search pattern: (class|id)=["']...["']
-        pattern = re.compile(r'\b(class|id)=("|\')(.*?)(\2)')
-        return pattern.sub(replace_attr_value, content)
+        get = self.mapping.get
+
+        def replace_values(values: str) -> str:
+            # values: attribute content (e.g., "btn btn-red")
+            target = get(values)
+            if target is not None:
+                # Common case: a single known class, no list/join needed
+                return target
+
+            # If value is in mapping, replace it. Otherwise, keep original.
+            return " ".join([get(val, val) for val in values.split()])
+
+        # One scan splits the file into [text, 'class=', quote, values, quote, text, ...];
+        # only the values are rewritten, without creating a match object per attribute
+        parts = ATTR_PATTERN.split(content)
+        parts[3::5] = [replace_values(values) for values in parts[3::5]]
+        return ''.join(parts)
 
     def process_css(self, content: str) -> str:
         """
@@ -104,22 +201,15 @@ class ContextProcessor:
         2. Changes selectors (.class, #id).
         3. Doesn't touch properties (color: red) or paths (url(...)).
         """
-        # We use a smart Lookbehind regex to target only specific selectors.
-        
-        processed_content = content
-        
-        for key in self.sorted_keys:
-            target = self.mapping[key]
-            
-            # Regex explanation:
-            # (?<=[.#])      -> Look for the word only if preceded by a dot or hash
-            # {re.escape(key)} -> The target word
-            # (?![\w-])      -> Ensure the word ends there (no suffixes like -primary)
-            # NOTE: This pattern won't match --variable since it has two hyphens, not . or #
-            pattern = re.compile(rf'(?<=[.#]){re.escape(key)}(?![\w-])')
-            processed_content = pattern.sub(target, processed_content)
-            
-        return processed_content
+        if not self.mapping:
+            return content
+
+        # One scan splits the file into [text, name, text, name, ...];
+        # every name is then replaced with a plain dict lookup
+        parts = CSS_SELECTOR_PATTERN.split(content)
+        get = self.mapping.get
+        parts[1::2] = [get(name, name) for name in parts[1::2]]
+        return ''.join(parts)
 
     def process_js(self, content: str) -> str:
         """
@@ -127,14 +217,21 @@ class ContextProcessor:
         Only changes string literals that exactly match a class name.
         Does NOT change dynamic concatenation ('btn-' + type).
         """
-        processed_content = content
-        for key in self.sorted_keys:
-            target = self.mapping[key]
-            # Look for exact word match inside quotes
-            # classList.add('my-class') -> classList.add('x3f4a1')
-            pattern = re.compile(rf'(["\']){re.escape(key)}\1')
-            processed_content = pattern.sub(f"\\1{target}\\1", processed_content)
-        return processed_content
+        if not self.mapping:
+            return content
+
+        if self._js_literals is not None:
+            for quoted, target in self._js_literals:
+                content = content.replace(quoted, target)
+            return content
+
+        # Look for exact word match inside quotes
+        # classList.add('my-class') -> classList.add('x3f4a1c09b2')
+        # One scan splits the file into [text, quote, key, text, quote, key, ...]
+        parts = self._js_pattern.split(content)
+        mapping = self.mapping
+        parts[2::3] = [mapping[key] for key in parts[2::3]]
+        return ''.join(parts)
 
 class ProjectObfuscator:
     def __init__(self, config: Config):
@@ -143,6 +240,13 @@ class ProjectObfuscator:
         self.src_path = self.root / self.cfg.SOURCE_DIR
         self.dist_path = self.root / self.cfg.DIST_DIR
         self.mapping: Dict[str, str] = {}
+        # str.endswith accepts a tuple: one C-level call per file instead of splitext
+        self._target_suffixes = tuple(self.cfg.TARGET_EXTENSIONS)
+        # Plain string paths for the per-file hot loop (no Path objects per file)
+        self._src_prefix_len = len(str(self.src_path)) + len(os.sep)
+        self._dist_dir = str(self.dist_path)
+        # Content digest -> already written dist file, so identical sources are transformed once
+        self._transformed: Dict[Tuple[str, bytes], str] = {}
         
         if not self.src_path.exists():
             raise FileNotFoundError(f"Source folder not found: {self.src_path}")
@@ -151,50 +255,156 @@ class ProjectObfuscator:
         """Phase 1: Scanning all HTML files to find classes and IDs."""
         logger.info("Starting source code scan...")
         selector_set = set()
-        
-        # Regex to find values inside class="" and id=""
-        attr_pattern = re.compile(r'\b(?:class|id)=["\'](.*?)["\']')
-
-        for file_path in self._walk_files(self.src_path):
-            if file_path.suffix in {'.html', '.htm'}:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    matches = attr_pattern.findall(content)
-                    for match in matches:
-                        # Split "btn btn-primary" into individual words
-                        names = match.split()
-                        for name in names:
-                            if name not in self.cfg.WHITELIST:
-                                selector_set.add(name)
-        
+
+        # Digest of file content -> names found in it
+        scanned: Dict[bytes, Set[str]] = {}
+
+        def scan_data(data) -> Set[str]:
+            # Identical files (e.g. copies of the same page) are scanned only once
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            names = scanned.get(digest)
+            if names is None:
+                names = set()
+                for match in ATTR_VALUE_PATTERN.findall(data):
+                    # Only the matches are decoded; split "btn btn-primary" into individual words
+                    # (interned, so cached sets of many files share one object per name)
+                    names.update(map(sys.intern, match.decode('utf-8', 'ignore').split()))
+                scanned[digest] = names
+            return names
+
+        def scan_file(file_path: str) -> Set[str]:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                    # Large file: search the mapped bytes instead of reading it whole
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        return scan_data(mm)
+                return scan_data(f.read())
+
+        html_files = (
+            file_path for file_path in self._walk_files(self.src_path)
+            if file_path.endswith(HTML_EXTENSIONS)
+        )
+
+        # Files are scanned in parallel; results are merged here, in one thread
+        with ThreadPoolExecutor() as executor:
+            for names in executor.map(scan_file, html_files):
+                selector_set.update(names - self.cfg.WHITELIST)
+
         logger.info(f"Found {len(selector_set)} unique selectors for obfuscation.")
         
         # Generate mapping
+        generate = Hasher.generate
         for selector in selector_set:
-            self.mapping[selector] = Hasher.generate(selector)
-
-    def _walk_files(self, path: Path) -> List[Path]:
-        """Recursive file traversal considering exclusions."""
-        files_found = []
-        for root, dirs, files in os.walk(path):
-            # Filter directories
-            dirs[:] = [d for d in dirs if d not in self.cfg.EXCLUDED_DIRS]
-            
-            for file in files:
-                file_path = Path(root) / file
-                if file_path.suffix in self.cfg.TARGET_EXTENSIONS:
-                    files_found.append(file_path)
-        return files_found
-
-    def _clone_project(self):
-        """Creates a full copy of the project in the dist folder."""
+            self.mapping[selector] = generate(selector)
+
+    def _walk_tree(self, path: Path, mirror: bool = False) -> Iterator[str]:
+        """
+        Recursive traversal of all files considering exclusions.
+        With mirror=True every visited directory (empty ones included) is created in dist.
+        """
+        # Directories still to visit; DirEntry caches the type, so no extra stat calls
+        pending = [str(path)]
+        while pending:
+            dir_path = pending.pop()
+            if mirror:
+                # Created before any of its files is yielded for writing
+                os.makedirs(os.path.join(self._dist_dir, dir_path[self._src_prefix_len:]), exist_ok=True)
+
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # Filter directories (and the build folder itself, if it lives inside src)
+                        if entry.name in self.cfg.EXCLUDED_DIRS or entry.path == self._dist_dir:
+                            continue
+                        # Directory symlinks are followed (like copytree), unless they point
+                        # back to a folder that contains them, which would never end
+                        if entry.is_symlink():
+                            target = os.path.realpath(entry.path)
+                            parent = os.path.realpath(dir_path)
+                            if parent == target or parent.startswith(target + os.sep):
+                                if mirror:  # Reported once, by the copy pass
+                                    logger.warning(f"Skipping symlink loop: {entry.path} -> {target}")
+                                continue
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.path
+
+    def _walk_files(self, path: Path) -> Iterator[str]:
+        """Files with target extensions only."""
+        for file_path in self._walk_tree(path):
+            if file_path.endswith(self._target_suffixes):
+                yield file_path
+
+    def _reset_dist(self):
+        """Removes the previous build so dist contains only fresh output."""
         if self.dist_path.exists():
             logger.warning(f"Removing old build version: {self.dist_path}")
             shutil.rmtree(self.dist_path)
-        
-        logger.info(f"Cloning project: {self.src_path} -> {self.dist_path}")
-        shutil.copytree(self.src_path, self.dist_path, 
-                        ignore=shutil.ignore_patterns(*self.cfg.EXCLUDED_DIRS))
+        self._transformed.clear()
+
+    @staticmethod
+    def _apply_strategy(processor: ContextProcessor, file_path: str, content: str) -> str:
+        """Applies the replacement strategy matching the file type."""
+        if file_path.endswith(HTML_EXTENSIONS):
+            # HTML may also contain internal styles,
+            # but for simplicity we only change attributes here
+            return processor.process_html(content)
+
+        if file_path.endswith('.css'):
+            return processor.process_css(content)
+
+        if file_path.endswith('.js'):
+            return processor.process_js(content)
+
+        return content
+
+    def _process_file(self, processor: ContextProcessor, file_path: str) -> bool:
+        """
+        Writes a single file to dist, applying replacements to target files.
+        Returns True if the file content was changed.
+        """
+        dest_path = os.path.join(self._dist_dir, file_path[self._src_prefix_len:])
+        try:
+            if file_path.endswith(self._target_suffixes):
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+
+                # Fast rejection: no key occurs anywhere in the raw bytes,
+                # so the file cannot change and is written back below
+                if processor.mentions_any(raw):
+                    # Identical files (e.g. duplicated vendor bundles) are transformed once;
+                    # later twins copy the result that was already written
+                    key = (file_path.rpartition('.')[2], hashlib.blake2b(raw, digest_size=16).digest())
+                    twin_path = self._transformed.get(key)
+                    if twin_path is not None:
+                        shutil.copyfile(twin_path, dest_path)
+                        shutil.copymode(file_path, dest_path)
+                        return True
+
+                    content = raw.decode('utf-8', 'ignore')
+                    new_content = self._apply_strategy(processor, file_path, content)
+
+                    # Save changes (line endings are kept as in the source)
+                    if new_content != content:
+                        with open(dest_path, 'wb') as f:
+                            f.write(new_content.encode('utf-8'))
+                        shutil.copymode(file_path, dest_path)
+                        self._transformed[key] = dest_path
+                        return True
+
+                # Unchanged target file: its bytes are already in memory, no second read
+                with open(dest_path, 'wb') as f:
+                    f.write(raw)
+                shutil.copystat(file_path, dest_path)
+                return False
+
+            # Non-target files (images, fonts, ...) are copied as-is
+            shutil.copy2(file_path, dest_path)
+
+        except Exception as e:
+            logger.error(f"Error while processing {file_path}: {e}")
+
+        return False
 
     def run(self):
         """Main execution method."""
@@ -205,51 +415,23 @@ class ProjectObfuscator:
         # 1. Scan sources and build hash map
         self._scan_selectors()
 
-        # 2. Create a working copy (to avoid touching originals)
-        self._clone_project()
-
-        # 3. Apply replacements in dist folder
+        # 2. Build the replacement patterns first: if this fails, the previous build is kept
         processor = ContextProcessor(self.mapping)
-        processed_count = 0
-
-        # Process files in the new dist folder
-        target_files = []
-        for root, dirs, files in os.walk(self.dist_path):
-             for file in files:
-                 fpath = Path(root) / file
-                 if fpath.suffix in self.cfg.TARGET_EXTENSIONS:
-                     target_files.append(fpath)
-
-        logger.info(f"Starting processing of {len(target_files)} files...")
-
-        for file_path in target_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
-                new_content = content
-                ext = file_path.suffix
-
-                # Apply strategy based on file type
-                if ext in {'.html', '.htm'}:
-                    new_content = processor.process_html(new_content)
-                    # HTML may also contain internal styles, 
-                    # but for simplicity we only change attributes here
-                
-                elif ext == '.css':
-                    new_content = processor.process_css(new_content)
-                
-                elif ext == '.js':
-                    new_content = processor.process_js(new_content)
-
-                # Save changes
-                if new_content != content:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(new_content)
-                    processed_count += 1
-            
-            except Exception as e:
-                logger.error(f"Error while processing {file_path}: {e}")
+
+        # 3. Prepare an empty output folder (originals are never touched)
+        self._reset_dist()
+
+        # 4. Write every file to dist, applying replacements on the way
+
+        logger.info(f"Processing project: {self.src_path} -> {self.dist_path}")
+
+        # Each file is read from src and written to dist independently
+        with ThreadPoolExecutor() as executor:
+            results = executor.map(
+                partial(self._process_file, processor),
+                self._walk_tree(self.src_path, mirror=True)
+            )
+            processed_count = sum(results)
 
         print("-" * 50)
         logger.info(f"✅ Success! Files processed: {processed_count}")
@@ -13,11 +13,15 @@ Enterprise Static Resource Obfuscator
 
 import os
 import re
+import sys
 import shutil
 import hashlib
+import mmap
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, partial
 from pathlib import Path
-from typing import Dict, Set, List, Pattern
+from typing import Dict, Set, Tuple, Iterator, Pattern
 from dataclasses import dataclass, field
 
 # --- КОНФИГУРАЦИЯ ЛОГГЕРА ---
@@ -28,6 +32,27 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Obfuscator")
 
+# Файлы больше этого размера сканируются через mmap, а не читаются целиком
+MMAP_THRESHOLD = 1 << 20  # 1 MiB
+
+# До такого числа ключей JS-литералы заменяются обычным str.replace
+# (два прохода на C на каждый ключ быстрее одного regex только для маленьких маппингов)
+JS_REPLACE_MAX_KEYS = 8
+
+# Суффиксы HTML-файлов (кортеж, чтобы передавать в str.endswith)
+HTML_EXTENSIONS = ('.html', '.htm')
+
+# --- ПРЕДКОМПИЛИРОВАННЫЕ ПАТТЕРНЫ ---
+# Атрибут, разбитый на части: (class=|id=)(["'])(значения)(кавычка) (замена)
+ATTR_PATTERN = re.compile(r'\b((?:class|id)=)("|\')(.*?)(\2)')
+# Значения внутри class="" и id="" (сканирование, по сырым байтам)
+ATTR_VALUE_PATTERN = re.compile(rb'\b(?:class|id)=["\'](.*?)["\']')
+# Имя, похожее на селектор, сразу после точки или решетки (CSS):
+# (?<=[.#])  -> Ищем только если перед словом стоит точка или решетка
+# ([\w-]+)   -> Слово целиком, поэтому 'btn' никогда не совпадет внутри 'btn-group'
+# ПРИ ЭТОМ: Этот паттерн не матчит --variable, так как там два дефиса, а не . или #
+CSS_SELECTOR_PATTERN = re.compile(r'(?<=[.#])([\w-]+)')
+
 @dataclass
 class Config:
     """Централизованная конфигурация проекта."""
@@ -60,9 +85,11 @@ class Hasher:
     @staticmethod
     def generate(name: str) -> str:
         """Создает короткий валидный CSS-идентификатор (начинается с буквы)."""
-        hash_obj = hashlib.md5(name.encode())
+        # 5 байт -> 10 hex-символов: без обрезки, и коллизии остаются маловероятными
+        # даже для десятков тысяч селекторов
+        hash_obj = hashlib.blake2b(name.encode(), digest_size=5)
         # Префикс 'x' гарантирует, что имя не начнется с цифры или дефиса
-        return f"x{hash_obj.hexdigest()[:6]}"
+        return f"x{hash_obj.hexdigest()}"
 
 class ContextProcessor:
     """
@@ -72,30 +99,100 @@ class ContextProcessor:
 
     def __init__(self, mapping: Dict[str, str]):
         self.mapping = mapping
-        # Сортируем ключи по длине (от длинных к коротким), чтобы избежать 
-        # частичной замены (например, чтобы замена 'btn' не сломала 'btn-group')
-        self.sorted_keys = sorted(self.mapping.keys(), key=len, reverse=True)
+        # Все ключи одним regex в форме дерева (trie). Длинные ключи по построению
+        # пробуются первыми, поэтому 'btn' не сломает 'btn-group' (сортировка не нужна)
+        keys_pattern = self._trie_pattern(self.mapping)
+
+        # Нужен для JS-паттерна, который компилируется, только когда он нужен файлу
+        self._keys_pattern = keys_pattern
+
+        # Маленький маппинг: литералы в кавычках меняем напрямую, без regex-движка
+        self._js_literals = None
+        if len(self.mapping) <= JS_REPLACE_MAX_KEYS:
+            self._js_literals = [
+                (f"{quote}{key}{quote}", f"{quote}{target}{quote}")
+                for key, target in self.mapping.items()
+                for quote in '"\''
+            ]
+
+        # Те же ключи по сырым байтам: дешевая проверка, нужно ли вообще обрабатывать файл
+        self._probe = re.compile(keys_pattern.encode())
+
+    @cached_property
+    def _js_pattern(self) -> Pattern:
+        """Компилируется при первом использовании: без JS-файлов или при малом маппинге не строится вовсе."""
+        # Один паттерн для всех ключей, чтобы JS-литералы менялись за один проход
+        # по файлу, а не отдельным re.sub на каждый ключ.
+        # (["'])         -> Открывающая кавычка
+        # (keys)         -> Любое известное имя класса (сначала длинные)
+        # (?=\1)         -> Закрывающая кавычка (не поглощается, она может открывать следующий литерал)
+        return re.compile(r'(["\'])(' + self._keys_pattern + r')(?=\1)')
+
+    @staticmethod
+    def _trie_pattern(keys) -> str:
+        """
+        Строит regex, который совпадает с любым из ключей, напр.
+        ['nav', 'navbar', 'card'] -> (?:nav(?:bar)?|card)
+        Общие префиксы объединяются, поэтому стоимость поиска зависит от длины
+        ключей, а не от их числа, а самый длинный ключ всегда пробуется первым.
+        """
+        trie: Dict[str, dict] = {}
+        for key in keys:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[''] = {}  # Конец ключа
+
+        # Обход в обратном порядке с явным стеком: узлу сначала нужны паттерны детей,
+        # а рекурсия переполнилась бы на ключах длиной от ~1000 символов
+        built: Dict[int, str] = {}  # id(узла) -> паттерн его поддерева
+        stack = [(trie, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for char, child in node.items() if char)
+                continue
+
+            branches = [re.escape(char) + built.pop(id(child))
+                        for char, child in node.items() if char]
+            if not branches:
+                body = ''
+            else:
+                body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+                if '' in node:
+                    # Здесь заканчивается ключ; необязательный хвост жадный, длинные ключи побеждают
+                    body = f"(?:{body})?"
+            built[id(node)] = body
+
+        return built[id(trie)]
+
+    def mentions_any(self, raw: bytes) -> bool:
+        """Быстрая проверка сырых байтов файла: встречается ли хоть один известный ключ?"""
+        return bool(self.mapping) and self._probe.search(raw) is not None
 
     def process_html(self, content: str) -> str:
         """
         Безопасная обработка HTML.
         Меняет классы и ID только внутри атрибутов class="..." и id="...".
         """
-        def replace_attr_value(match):
-            attr_name = match.group(1) # class или id
-            quote = match.group(2)     # " или '
-            values = match.group(3)    # содержимое атрибута (напр. "btn btn-red")
-            
-            new_values = []
-            for val in values.split():
-                # Если значение есть в маппинге, меняем. Если нет — оставляем.
-                new_values.append(self.mapping.get(val, val))
-            
-            return f'{attr_name}={quote}{" ".join(new_values)}{quote}'
-
-        # Ищем паттерн: (class|id)=["']...["']
-        pattern = re.compile(r'\b(class|id)=("|\')(.*?)(\2)')
-        return pattern.sub(replace_attr_value, content)
+        get = self.mapping.get
+
+        def replace_values(values: str) -> str:
+            # values: содержимое атрибута (напр. "btn btn-red")
+            target = get(values)
+            if target is not None:
+                # Частый случай: один известный класс, список и join не нужны
+                return target
+
+            # Если значение есть в маппинге, меняем. Если нет — оставляем.
+            return " ".join([get(val, val) for val in values.split()])
+
+        # Один проход разбивает файл на [текст, 'class=', кавычка, значения, кавычка, текст, ...];
+        # меняются только значения, без создания match-объекта на каждый атрибут
+        parts = ATTR_PATTERN.split(content)
+        parts[3::5] = [replace_values(values) for values in parts[3::5]]
+        return ''.join(parts)
 
     def process_css(self, content: str) -> str:
         """
@@ -104,23 +201,15 @@ class ContextProcessor:
         2. Меняет селекторы (.class, #id).
         3. Не трогает свойства (color: red) и пути (url(...)).
         """
-        # Сначала защитим переменные, заменив их на плейсхолдеры (чтобы случайно не задеть)
-        # Это сложная логика, поэтому пойдем путем умного Lookbehind regex.
-        
-        processed_content = content
-        
-        for key in self.sorted_keys:
-            target = self.mapping[key]
-            
-            # Regex объяснение:
-            # (?<=[.#])      -> Ищем только если перед словом стоит точка или решетка
-            # {re.escape(key)} -> Наше искомое слово
-            # (?![\w-])      -> И убеждаемся, что слово закончилось (нет продолжения типа -primary)
-            # ПРИ ЭТОМ: Этот паттерн не матчит --variable, так как там два дефиса, а не . или #
-            pattern = re.compile(rf'(?<=[.#]){re.escape(key)}(?![\w-])')
-            processed_content = pattern.sub(target, processed_content)
-            
-        return processed_content
+        if not self.mapping:
+            return content
+
+        # Один проход разбивает файл на [текст, имя, текст, имя, ...];
+        # затем каждое имя заменяется простым поиском в словаре
+        parts = CSS_SELECTOR_PATTERN.split(content)
+        get = self.mapping.get
+        parts[1::2] = [get(name, name) for name in parts[1::2]]
+        return ''.join(parts)
 
     def process_js(self, content: str) -> str:
         """
@@ -128,14 +217,21 @@ class ContextProcessor:
         Меняет только строковые литералы, которые точно совпадают с именем класса.
         НЕ меняет динамическую конкатенацию ('btn-' + type).
         """
-        processed_content = content
-        for key in self.sorted_keys:
-            target = self.mapping[key]
-            # Ищем точное совпадение слова в кавычках
-            # classList.add('my-class') -> classList.add('x3f4a1')
-            pattern = re.compile(rf'(["\']){re.escape(key)}\1')
-            processed_content = pattern.sub(f"\\1{target}\\1", processed_content)
-        return processed_content
+        if not self.mapping:
+            return content
+
+        if self._js_literals is not None:
+            for quoted, target in self._js_literals:
+                content = content.replace(quoted, target)
+            return content
+
+        # Ищем точное совпадение слова в кавычках
+        # classList.add('my-class') -> classList.add('x3f4a1c09b2')
+        # Один проход разбивает файл на [текст, кавычка, ключ, текст, кавычка, ключ, ...]
+        parts = self._js_pattern.split(content)
+        mapping = self.mapping
+        parts[2::3] = [mapping[key] for key in parts[2::3]]
+        return ''.join(parts)
 
 class ProjectObfuscator:
     def __init__(self, config: Config):
@@ -144,6 +240,13 @@ class ProjectObfuscator:
         self.src_path = self.root / self.cfg.SOURCE_DIR
         self.dist_path = self.root / self.cfg.DIST_DIR
         self.mapping: Dict[str, str] = {}
+        # str.endswith принимает кортеж: один вызов на C на файл вместо splitext
+        self._target_suffixes = tuple(self.cfg.TARGET_EXTENSIONS)
+        # Строковые пути для горячего цикла по файлам (без объектов Path на каждый файл)
+        self._src_prefix_len = len(str(self.src_path)) + len(os.sep)
+        self._dist_dir = str(self.dist_path)
+        # Хеш содержимого -> уже записанный файл в dist, чтобы одинаковые исходники обрабатывались один раз
+        self._transformed: Dict[Tuple[str, bytes], str] = {}
         
         if not self.src_path.exists():
             raise FileNotFoundError(f"Исходная папка не найдена: {self.src_path}")
@@ -152,50 +255,156 @@ class ProjectObfuscator:
         """Этап 1: Сканирование всех HTML файлов для поиска классов и ID."""
         logger.info("Начинаю сканирование исходных кодов...")
         selector_set = set()
-        
-        # Regex для поиска значений внутри class="" и id=""
-        attr_pattern = re.compile(r'\b(?:class|id)=["\'](.*?)["\']')
-
-        for file_path in self._walk_files(self.src_path):
-            if file_path.suffix in {'.html', '.htm'}:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    matches = attr_pattern.findall(content)
-                    for match in matches:
-                        # Разбиваем "btn btn-primary" на отдельные слова
-                        names = match.split()
-                        for name in names:
-                            if name not in self.cfg.WHITELIST:
-                                selector_set.add(name)
-        
+
+        # Хеш содержимого файла -> найденные в нем имена
+        scanned: Dict[bytes, Set[str]] = {}
+
+        def scan_data(data) -> Set[str]:
+            # Одинаковые файлы (напр. копии одной страницы) сканируются только один раз
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            names = scanned.get(digest)
+            if names is None:
+                names = set()
+                for match in ATTR_VALUE_PATTERN.findall(data):
+                    # Декодируются только совпадения; разбиваем "btn btn-primary" на отдельные слова
+                    # (интернируем, чтобы кэш многих файлов хранил один объект на имя)
+                    names.update(map(sys.intern, match.decode('utf-8', 'ignore').split()))
+                scanned[digest] = names
+            return names
+
+        def scan_file(file_path: str) -> Set[str]:
+            with open(file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size > MMAP_THRESHOLD:
+                    # Большой файл: ищем по отображенным байтам, а не читаем его целиком
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        return scan_data(mm)
+                return scan_data(f.read())
+
+        html_files = (
+            file_path for file_path in self._walk_files(self.src_path)
+            if file_path.endswith(HTML_EXTENSIONS)
+        )
+
+        # Файлы сканируются параллельно; результаты сливаем здесь, в одном потоке
+        with ThreadPoolExecutor() as executor:
+            for names in executor.map(scan_file, html_files):
+                selector_set.update(names - self.cfg.WHITELIST)
+
         logger.info(f"Найдено {len(selector_set)} уникальных селекторов для обфускации.")
         
         # Генерируем маппинг
+        generate = Hasher.generate
         for selector in selector_set:
-            self.mapping[selector] = Hasher.generate(selector)
-
-    def _walk_files(self, path: Path) -> List[Path]:
-        """Рекурсивный обход файлов с учетом исключений."""
-        files_found = []
-        for root, dirs, files in os.walk(path):
-            # Фильтрация папок
-            dirs[:] = [d for d in dirs if d not in self.cfg.EXCLUDED_DIRS]
-            
-            for file in files:
-                file_path = Path(root) / file
-                if file_path.suffix in self.cfg.TARGET_EXTENSIONS:
-                    files_found.append(file_path)
-        return files_found
-
-    def _clone_project(self):
-        """Создает полную копию проекта в папку dist."""
+            self.mapping[selector] = generate(selector)
+
+    def _walk_tree(self, path: Path, mirror: bool = False) -> Iterator[str]:
+        """
+        Рекурсивный обход всех файлов с учетом исключений.
+        При mirror=True каждая пройденная папка (включая пустые) создается в dist.
+        """
+        # Папки, которые еще нужно обойти; DirEntry кэширует тип, лишних stat не будет
+        pending = [str(path)]
+        while pending:
+            dir_path = pending.pop()
+            if mirror:
+                # Создается до того, как любой ее файл будет отдан на запись
+                os.makedirs(os.path.join(self._dist_dir, dir_path[self._src_prefix_len:]), exist_ok=True)
+
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        # Фильтрация папок (и самой папки билда, если она лежит внутри src)
+                        if entry.name in self.cfg.EXCLUDED_DIRS or entry.path == self._dist_dir:
+                            continue
+                        # По симлинкам на папки идем (как copytree), кроме ссылок на папку,
+                        # которая их содержит: такой обход никогда бы не закончился
+                        if entry.is_symlink():
+                            target = os.path.realpath(entry.path)
+                            parent = os.path.realpath(dir_path)
+                            if parent == target or parent.startswith(target + os.sep):
+                                if mirror:  # Сообщаем один раз, при копировании
+                                    logger.warning(f"Пропуск зацикленного симлинка: {entry.path} -> {target}")
+                                continue
+                        pending.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.path
+
+    def _walk_files(self, path: Path) -> Iterator[str]:
+        """Только файлы с целевыми расширениями."""
+        for file_path in self._walk_tree(path):
+            if file_path.endswith(self._target_suffixes):
+                yield file_path
+
+    def _reset_dist(self):
+        """Удаляет предыдущий билд, чтобы в dist был только свежий результат."""
         if self.dist_path.exists():
             logger.warning(f"Удаление старой версии билда: {self.dist_path}")
             shutil.rmtree(self.dist_path)
-        
-        logger.info(f"Клонирование проекта: {self.src_path} -> {self.dist_path}")
-        shutil.copytree(self.src_path, self.dist_path, 
-                       ignore=shutil.ignore_patterns(*self.cfg.EXCLUDED_DIRS))
+        self._transformed.clear()
+
+    @staticmethod
+    def _apply_strategy(processor: ContextProcessor, file_path: str, content: str) -> str:
+        """Применяет стратегию замены в зависимости от типа файла."""
+        if file_path.endswith(HTML_EXTENSIONS):
+            # HTML также может содержать внутренние стили,
+            # но для простоты здесь меняем только атрибуты
+            return processor.process_html(content)
+
+        if file_path.endswith('.css'):
+            return processor.process_css(content)
+
+        if file_path.endswith('.js'):
+            return processor.process_js(content)
+
+        return content
+
+    def _process_file(self, processor: ContextProcessor, file_path: str) -> bool:
+        """
+        Записывает один файл в dist, применяя замены к целевым файлам.
+        Возвращает True, если содержимое файла изменилось.
+        """
+        dest_path = os.path.join(self._dist_dir, file_path[self._src_prefix_len:])
+        try:
+            if file_path.endswith(self._target_suffixes):
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+
+                # Быстрый отсев: ни один ключ не встречается в сырых байтах,
+                # значит файл не изменится и записывается ниже как есть
+                if processor.mentions_any(raw):
+                    # Одинаковые файлы (напр. дубли vendor-бандлов) обрабатываются один раз;
+                    # следующие копии берут уже записанный результат
+                    key = (file_path.rpartition('.')[2], hashlib.blake2b(raw, digest_size=16).digest())
+                    twin_path = self._transformed.get(key)
+                    if twin_path is not None:
+                        shutil.copyfile(twin_path, dest_path)
+                        shutil.copymode(file_path, dest_path)
+                        return True
+
+                    content = raw.decode('utf-8', 'ignore')
+                    new_content = self._apply_strategy(processor, file_path, content)
+
+                    # Записываем изменения (переводы строк сохраняются как в исходнике)
+                    if new_content != content:
+                        with open(dest_path, 'wb') as f:
+                            f.write(new_content.encode('utf-8'))
+                        shutil.copymode(file_path, dest_path)
+                        self._transformed[key] = dest_path
+                        return True
+
+                # Неизмененный целевой файл: его байты уже в памяти, повторно не читаем
+                with open(dest_path, 'wb') as f:
+                    f.write(raw)
+                shutil.copystat(file_path, dest_path)
+                return False
+
+            # Нецелевые файлы (картинки, шрифты, ...) копируем как есть
+            shutil.copy2(file_path, dest_path)
+
+        except Exception as e:
+            logger.error(f"Ошибка при обработке {file_path}: {e}")
+
+        return False
 
     def run(self):
         """Главный метод запуска."""
@@ -206,51 +415,23 @@ class ProjectObfuscator:
         # 1. Сканируем исходники и строим карту хешей
         self._scan_selectors()
 
-        # 2. Создаем рабочую копию (чтобы не трогать исходники)
-        self._clone_project()
-
-        # 3. Применяем замены в dist папке
+        # 2. Сначала строим паттерны замен: если это упадет, прошлый билд останется
         processor = ContextProcessor(self.mapping)
-        processed_count = 0
-
-        # Обрабатываем файлы в новой папке dist
-        target_files = []
-        for root, dirs, files in os.walk(self.dist_path):
-             for file in files:
-                 fpath = Path(root) / file
-                 if fpath.suffix in self.cfg.TARGET_EXTENSIONS:
-                     target_files.append(fpath)
-
-        logger.info(f"Начинаю обработку {len(target_files)} файлов...")
-
-        for file_path in target_files:
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                
-                new_content = content
-                ext = file_path.suffix
-
-                # Применяем стратегию в зависимости от типа файла
-                if ext in {'.html', '.htm'}:
-                    new_content = processor.process_html(new_content)
-                    # HTML также может содержать внутренние стили, 
-                    # но для простоты здесь меняем только атрибуты
-                
-                elif ext == '.css':
-                    new_content = processor.process_css(new_content)
-                
-                elif ext == '.js':
-                    new_content = processor.process_js(new_content)
-
-                # Записываем изменения
-                if new_content != content:
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(new_content)
-                    processed_count += 1
-            
-            except Exception as e:
-                logger.error(f"Ошибка при обработке {file_path}: {e}")
+
+        # 3. Готовим пустую папку для результата (исходники не трогаем)
+        self._reset_dist()
+
+        # 4. Записываем каждый файл в dist, применяя замены по пути
+
+        logger.info(f"Обработка проекта: {self.src_path} -> {self.dist_path}")
+
+        # Каждый файл читается из src и пишется в dist независимо от других
+        with ThreadPoolExecutor() as executor:
+            results = executor.map(
+                partial(self._process_file, processor),
+                self._walk_tree(self.src_path, mirror=True)
+            )
+            processed_count = sum(results)
 
         print("-" * 50)
         logger.info(f"✅ Успешно! Обработано файлов: {processed_count}")
@@ -1,13 +1,11 @@
 import os
+import sys
 
-def create_pure_demo():
-    """
-    Generates a standalone web project with zero external dependencies.
-    Designed specifically to test class and ID obfuscation.
-    """
-    
-    # 1. HTML - Pure structure
-    html_content = """<!DOCTYPE html>
+# --- DEMO SOURCES ---
+# ASCII-only constants, kept as bytes: written as-is, without an encoding pass
+
+# 1. HTML - Pure structure
+HTML_CONTENT = b"""<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -42,8 +40,8 @@ def create_pure_demo():
 </body>
 </html>"""
 
-    # 2. CSS - Using complex nesting and custom properties
-    css_content = """/* Global Styles */
+# 2. CSS - Using complex nesting and custom properties
+CSS_CONTENT = b"""/* Global Styles */
 :root {
     --primary-color: #2563eb;
     --success-color: #16a34a;
@@ -123,8 +121,8 @@ def create_pure_demo():
     display: none;
 }"""
 
-    # 3. JS - Logic with selectors and class manipulation
-    js_content = """document.addEventListener('DOMContentLoaded', () => {
+# 3. JS - Logic with selectors and class manipulation
+JS_CONTENT = b"""document.addEventListener('DOMContentLoaded', () => {
     const startBtn = document.getElementById('init-sequence-btn');
     const indicator = document.getElementById('system-indicator');
     const logWindow = document.getElementById('data-log-window');
@@ -150,20 +148,46 @@ def create_pure_demo():
     });
 });"""
 
+# Files of the demo project: (filename, content) pairs, written in this order
+DEMO_FILES = (
+    ("index.html", HTML_CONTENT),
+    ("style.css", CSS_CONTENT),
+    ("script.js", JS_CONTENT),
+)
+
+def _write_project(files):
+    """Writes (filename, bytes) pairs to the current directory."""
+    # O_BINARY exists only on Windows, where it disables newline translation.
+    # No O_SYNC/O_DSYNC and no fsync: demo files need no durability, they are
+    # simply regenerated on the next run
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+    for filename, content in files:
+        # Raw descriptor: the whole file goes out in a single write, no file object around it
+        fd = os.open(filename, flags, 0o644)
+        try:
+            # os.write may accept only part of the buffer; keep going until all of it is out
+            view = memoryview(content)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+def create_pure_demo():
+    """
+    Generates a standalone web project with zero external dependencies.
+    Designed specifically to test class and ID obfuscation.
+    """
+
     # Writing files
-    files = {
-        "index.html": html_content,
-        "style.css": css_content,
-        "script.js": js_content
-    }
-
-    for filename, content in files.items():
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(content)
-        print(f"[+] Generated: {filename}")
-
-    print("\n[SUCCESS] Pure demo project ready. No external dependencies.")
-    print("[RUN] 'python encoder.py' to test obfuscation on this local code.")
+    _write_project(DEMO_FILES)
+
+    report = [f"[+] Generated: {filename}\n" for filename, _ in DEMO_FILES]
+    report.append("\n[SUCCESS] Pure demo project ready. No external dependencies.\n")
+    report.append("[RUN] 'python encoder.py' to test obfuscation on this local code.\n")
+
+    # The whole report goes out in one write instead of a print per line
+    sys.stdout.write("".join(report))
 
 if __name__ == "__main__":
     create_pure_demo()
\ No newline at end of file